@@ -32,6 +32,9 @@ if path not in sys.path:
 del os, sys, path
 # --------
 
+import os
+import shutil
+
 
 # ----------------------
 # debug low level output
@@ -46,6 +49,116 @@ def _dbg(text):
     sys.__stdout__.flush()
 
 
+def _basename_bytes(path):
+    """
+    Basename which accepts either slash, without splitting the whole path.
+    """
+    # when neither is found: -1 + 1 slices from the start.
+    return path[max(path.rfind(b'/'), path.rfind(b'\\')) + 1:]
+
+
+def _dir_with_sep(path):
+    """
+    Directory to prefix relative paths with (matches 'os.path.join' for relative paths).
+    """
+    sep = os.sep.encode('ascii')
+    if path and not path.endswith(sep):
+        return path + sep
+    return path
+
+
+def _fast_copy(src, dst, src_missing_ok=False):
+    """
+    Copy the file contents and permission bits (same as ``shutil.copy``),
+    keeping the data in kernel space where possible.
+
+    :arg src_missing_ok: When True, a missing ``src`` (or a directory)
+       isn't an error, False is returned instead of True.
+    """
+    import stat
+    import errno
+
+    try:
+        fsrc = open(src, 'rb')
+    except (FileNotFoundError, IsADirectoryError):
+        if src_missing_ok:
+            return False
+        raise
+
+    with fsrc:
+        st_src = os.fstat(fsrc.fileno())
+
+        # same as 'shutil.copy', opening 'dst' for writing would truncate the source.
+        try:
+            st_dst = os.stat(dst)
+        except FileNotFoundError:
+            pass
+        else:
+            if os.path.samestat(st_src, st_dst):
+                raise shutil.SameFileError("%r and %r are the same file" % (src, dst))
+
+        with open(dst, 'wb') as fdst:
+            fd_src = fsrc.fileno()
+            fd_dst = fdst.fileno()
+            size = st_src.st_size
+            offset = 0
+
+            for copy_fn in _fast_copy_funcs:
+                try:
+                    while offset < size:
+                        copied = copy_fn(fd_src, fd_dst, size - offset)
+                        if copied == 0:
+                            break
+                        offset += copied
+                except OSError as ex:
+                    # not supported for this file-system, try the next method.
+                    if ex.errno not in {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}:
+                        raise
+                if offset >= size:
+                    break
+            else:
+                # copy whatever remains in user space.
+                fsrc.seek(offset)
+                fdst.seek(offset)
+                shutil.copyfileobj(fsrc, fdst, 1 << 20)
+
+            # use the open file descriptors,
+            # avoids 'shutil.copymode' looking up both paths again.
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd_dst, stat.S_IMODE(st_src.st_mode))
+                return True
+
+    shutil.copymode(src, dst)
+    return True
+
+
+def _try_link(src, dst):
+    """
+    Hard-link ``src`` to ``dst``, returning False when this isn't possible
+    (different file-systems, no support or ``dst`` exists).
+    """
+    if not hasattr(os, "link"):
+        return False
+    try:
+        os.link(src, dst)
+    except OSError:
+        return False
+    return True
+
+
+def _fast_copy_funcs_init():
+    funcs = []
+    # Linux 4.5+
+    if hasattr(os, "copy_file_range"):
+        funcs.append(os.copy_file_range)
+    if hasattr(os, "sendfile"):
+        funcs.append(lambda fd_src, fd_dst, count: os.sendfile(fd_dst, fd_src, None, count))
+    return tuple(funcs)
+
+_fast_copy_funcs = _fast_copy_funcs_init()
+del _fast_copy_funcs_init
+
+
 def _relpath_remap(
         path_src,
         base_dir_src,
@@ -53,8 +166,6 @@ def _relpath_remap(
         blendfile_src_dir_fakeroot,
         ):
 
-    import os
-
     if not os.path.isabs(path_src):
         # Absolute win32 paths on a unix system
         # cause bad issues!
@@ -137,6 +248,11 @@ def pack(
         # Filename filter, allow to exclude files from the pack,
         # function takes a string returns True if the files should be included.
         filename_filter=None,
+
+        # Number of threads used for file copying (mode='FILE'),
+        # copying starts while blend files are being scanned.
+        # None to select automatically.
+        max_workers=None,
         ):
     """
     :param deps_remap: Store path deps_remap info as follows.
@@ -155,7 +271,6 @@ def pack(
     #   this means that the same libs wont be touched many times to modify the same data
     #   also prevents cyclic loops from crashing.
 
-    import os
     import sys
 
     if sys.stdout.isatty():
@@ -178,6 +293,9 @@ def pack(
     # path_temp_files --> original-location
     path_temp_files_orig = {}
 
+    # path_temp_files which are hard-links to the original (only when 'readonly')
+    path_temp_files_linked = set()
+
     TEMP_SUFFIX = b'@'
 
     if report is None:
@@ -201,6 +319,10 @@ def pack(
         else:
             base_dir_dst_temp = os.path.join(base_dir_dst, b'__blendfile_pack__')
 
+    # for joining relative paths (avoids calling 'os.path.join' for each file)
+    base_dir_dst_sep = _dir_with_sep(base_dir_dst)
+    base_dir_dst_temp_sep = _dir_with_sep(base_dir_dst_temp)
+
     def temp_remap_cb(filepath, rootdir):
         """
         Create temp files in the destination path.
@@ -220,14 +342,18 @@ def pack(
 
         # then get the file relative to the new location
         filepath_tmp = _relpath_remap(filepath, base_dir_src, fp_basedir_conv, blendfile_src_dir_fakeroot)[0]
-        filepath_tmp = os.path.normpath(os.path.join(base_dir_dst_temp, filepath_tmp)) + TEMP_SUFFIX
+        filepath_tmp = os.path.normpath(base_dir_dst_temp_sep + filepath_tmp) + TEMP_SUFFIX
 
         # only overwrite once (so we can write into a path already containing files)
         if filepath_tmp not in path_temp_files:
             if mode != 'NONE':
-                import shutil
                 os.makedirs(os.path.dirname(filepath_tmp), exist_ok=True)
-                shutil.copy(filepath, filepath_tmp)
+                # when the file won't be written to, link instead of copying when possible
+                # (links are broken when moving the files into place).
+                if readonly and _try_link(filepath, filepath_tmp):
+                    path_temp_files_linked.add(filepath_tmp)
+                else:
+                    _fast_copy(filepath, filepath_tmp)
             path_temp_files.add(filepath_tmp)
             path_temp_files_orig[filepath_tmp] = filepath
         if mode != 'NONE':
@@ -299,252 +425,337 @@ def pack(
         blendfile_level_cb_enter = blendfile_level_cb_exit = None
         blendfile_levels_dict_curr = None
 
-    lib_visit = {}
-    fp_blend_basename_last = b''
-
-    for fp, (rootdir, fp_blend_basename) in blendfile_path_walker.FilePath.visit_from_blend(
-            blendfile_src,
-            readonly=readonly,
-            temp_remap_cb=temp_remap_cb,
-            recursive=True,
-            recursive_all=all_deps,
-            lib_visit=lib_visit,
-            blendfile_level_cb=(
-                blendfile_level_cb_enter,
-                blendfile_level_cb_exit,
-                )
-            ):
-
-        # we could pass this in!
-        fp_blend = os.path.join(fp.basedir, fp_blend_basename)
-
-        if fp_blend_basename_last != fp_blend_basename:
-            yield report("  %s:       %s\n" % (colorize("blend", color='blue'), fp_blend))
-            fp_blend_basename_last = fp_blend_basename
-
+    # mode='FILE' only, always shut down (see 'finally' below).
+    copy_executor = None
+    try:
+        # Copy files while scanning blend files (mode='FILE'),
+        # so reading blend files and copying files overlap.
+        if mode == 'FILE':
+            from concurrent.futures import ThreadPoolExecutor
+
+            # each file operation is independent & I/O bound, overlap them using threads.
+            # threads are only started as files are submitted,
+            # so this matches a limit of: min(32, number of files).
+            if max_workers is None:
+                max_workers = 32
+            copy_executor = ThreadPoolExecutor(max_workers=max_workers)
+            # {future: (src, dst)}, None for temp files
+            copy_futures = {}
+            # only copy to each destination once (so threads never write to the same file),
+            # 'normcase' also folds case on WIN32 (the same file may be referenced with a different case).
+            # {normcase(dst): normcase(src)}
+            copy_dst_visit = {}
+            # [(src, dst, src_other), ...] different sources for the same destination,
+            # the first source is copied, the others are reported.
+            copy_dst_conflict = []
+
+            def copy_files_submit(files):
+                for src, dst in files:
+                    assert(b'.blend' not in dst)
+
+                    dst_key = os.path.normcase(dst)
+                    src_key = os.path.normcase(src)
+                    src_key_other = copy_dst_visit.get(dst_key)
+                    if src_key_other is None:
+                        copy_dst_visit[dst_key] = src_key
+                        copy_futures[copy_executor.submit(_fast_copy, src, dst, True)] = (src, dst)
+                    elif src_key_other != src_key:
+                        copy_dst_conflict.append((src, dst, src_key_other))
+        else:
+            copy_files_submit = None
+
+        lib_visit = {}
+        fp_blend_basename_last = b''
+
+        for fp, (rootdir, fp_blend_basename) in blendfile_path_walker.FilePath.visit_from_blend(
+                blendfile_src,
+                readonly=readonly,
+                temp_remap_cb=temp_remap_cb,
+                recursive=True,
+                recursive_all=all_deps,
+                lib_visit=lib_visit,
+                blendfile_level_cb=(
+                    blendfile_level_cb_enter,
+                    blendfile_level_cb_exit,
+                    )
+                ):
+
+            # we could pass this in!
+            fp_blend = os.path.join(fp.basedir, fp_blend_basename)
+
+            if fp_blend_basename_last != fp_blend_basename:
+                yield report("  %s:       %s\n" % (colorize("blend", color='blue'), fp_blend))
+                fp_blend_basename_last = fp_blend_basename
+
+                if binary_edits is not None:
+                    # TODO, temp_remap_cb makes paths, this isn't ideal,
+                    # in this case we only want to remap!
+                    if mode == 'NONE':
+                        tmp = temp_remap_cb(fp_blend, base_dir_src)
+                        tmp = os.path.relpath(tmp, base_dir_src)
+                    else:
+                        tmp = temp_remap_cb(fp_blend, base_dir_src)
+                        tmp = os.path.relpath(tmp[:-len(TEMP_SUFFIX)], base_dir_dst_temp)
+                    binary_edits_curr = binary_edits.setdefault(tmp, [])
+                    del tmp
+
+            # assume the path might be relative
+            path_src_orig = fp.filepath
+            path_rel = blendfile_path_walker.utils.compatpath(path_src_orig)
+            path_src = blendfile_path_walker.utils.abspath(path_rel, fp.basedir)
+            path_src = os.path.normpath(path_src)
+
+            if filename_filter and not filename_filter(path_src):
+                yield report("  %s:     %r\n" % (colorize("exclude", color='yellow'), path_src))
+                continue
+
+            # apply variation (if available)
+            if use_variations:
+                if blendfile_levels_dict_curr:
+                    path_src_variation = blendfile_levels_dict_curr.get(path_src)
+                    if path_src_variation is not None:
+                        path_src = path_src_variation
+                        # keep the directory of 'path_rel', replacing the file name.
+                        path_rel = (
+                                path_rel[:len(path_rel) - len(_basename_bytes(path_rel))] +
+                                _basename_bytes(path_src))
+                    del path_src_variation
+
+            # destination path realtive to the root
+            # assert(b'..' not in path_src)
+            assert(b'..' not in base_dir_src)
+
+            # first remap this blend file to the location it will end up (so we can get images relative to _that_)
+            # TODO(cam) cache the results
+            fp_basedir_conv = _relpath_remap(fp_blend, base_dir_src, base_dir_src, blendfile_src_dir_fakeroot)[0]
+            fp_basedir_conv = os.path.join(base_dir_src, os.path.dirname(fp_basedir_conv))
+
+            # then get the file relative to the new location
+            path_dst, path_dst_final = _relpath_remap(path_src, base_dir_src, fp_basedir_conv, blendfile_src_dir_fakeroot)
+
+            path_dst = base_dir_dst_sep + path_dst
+
+            path_dst_final = b'//' + path_dst_final
+
+            # Assign direct or add to edit-list (to apply later)
+            if not readonly:
+                fp.filepath = path_dst_final
             if binary_edits is not None:
-                # TODO, temp_remap_cb makes paths, this isn't ideal,
-                # in this case we only want to remap!
-                if mode == 'NONE':
-                    tmp = temp_remap_cb(fp_blend, base_dir_src)
-                    tmp = os.path.relpath(tmp, base_dir_src)
-                else:
-                    tmp = temp_remap_cb(fp_blend, base_dir_src)
-                    tmp = os.path.relpath(tmp[:-len(TEMP_SUFFIX)], base_dir_dst_temp)
-                binary_edits_curr = binary_edits.setdefault(tmp, [])
-                del tmp
-
-        # assume the path might be relative
-        path_src_orig = fp.filepath
-        path_rel = blendfile_path_walker.utils.compatpath(path_src_orig)
-        path_src = blendfile_path_walker.utils.abspath(path_rel, fp.basedir)
-        path_src = os.path.normpath(path_src)
-
-        if filename_filter and not filename_filter(path_src):
-            yield report("  %s:     %r\n" % (colorize("exclude", color='yellow'), path_src))
-            continue
-
-        # apply variation (if available)
-        if use_variations:
-            if blendfile_levels_dict_curr:
-                path_src_variation = blendfile_levels_dict_curr.get(path_src)
-                if path_src_variation is not None:
-                    path_src = path_src_variation
-                    path_rel = os.path.join(os.path.dirname(path_rel), os.path.basename(path_src))
-                del path_src_variation
-
-        # destination path realtive to the root
-        # assert(b'..' not in path_src)
-        assert(b'..' not in base_dir_src)
-
-        # first remap this blend file to the location it will end up (so we can get images relative to _that_)
-        # TODO(cam) cache the results
-        fp_basedir_conv = _relpath_remap(fp_blend, base_dir_src, base_dir_src, blendfile_src_dir_fakeroot)[0]
-        fp_basedir_conv = os.path.join(base_dir_src, os.path.dirname(fp_basedir_conv))
-
-        # then get the file relative to the new location
-        path_dst, path_dst_final = _relpath_remap(path_src, base_dir_src, fp_basedir_conv, blendfile_src_dir_fakeroot)
-
-        path_dst = os.path.join(base_dir_dst, path_dst)
-
-        path_dst_final = b'//' + path_dst_final
+                fp.filepath_assign_edits(path_dst_final, binary_edits_curr)
+
+            # add to copy-list
+            # never copy libs (handled separately)
+            if not isinstance(fp, blendfile_path_walker.FPElem_block_path) or fp.userdata[0].code != b'LI':
+                path_copy_files.add((path_src, path_dst))
+                if copy_files_submit is not None:
+                    copy_files_submit(((path_src, path_dst),))
+
+                for file_list in (
+                        blendfile_path_walker.utils.find_sequence_paths(path_src) if fp.is_sequence else (),
+                        fp.files_siblings(),
+                        ):
+
+                    _src_dir = os.path.dirname(path_src)
+                    _dst_dir = os.path.dirname(path_dst)
+                    _copy_files = {
+                            (os.path.join(_src_dir, f), os.path.join(_dst_dir, f))
+                            for f in file_list
+                            }
+                    path_copy_files.update(_copy_files)
+                    if copy_files_submit is not None:
+                        # sorted, so the same file wins when destinations conflict.
+                        copy_files_submit(sorted(_copy_files))
+                    del _src_dir, _dst_dir, _copy_files
+
+            if deps_remap is not None:
+                # this needs to become JSON later... ugh, need to use strings
+                deps_remap.setdefault(
+                        fp_blend_basename.decode('utf-8'),
+                        {})[path_dst_final.decode('utf-8')] = path_src_orig.decode('utf-8')
+
+        del lib_visit, fp_blend_basename_last
+
+        if mode == 'FILE':
+            # sources which weren't copied (conflicting destinations),
+            # so 'paths_remap' & 'paths_uuid' only reference the files which were.
+            path_copy_files.difference_update(
+                    (src, dst) for src, dst, src_other in copy_dst_conflict)
+
+        if TIMEIT:
+            print("  Time: %.4f\n" % (time.time() - t))
+
+        yield report(("%s: %d files\n") %
+                     (colorize("\narchiving", color='bright_green'), len(path_copy_files) + 1))
+
+        # handle deps_remap and file renaming
+        if deps_remap is not None:
+            blendfile_src_basename = os.path.basename(blendfile_src).decode('utf-8')
+            blendfile_dst_basename = os.path.basename(blendfile_dst).decode('utf-8')
 
-        # Assign direct or add to edit-list (to apply later)
-        if not readonly:
-            fp.filepath = path_dst_final
-        if binary_edits is not None:
-            fp.filepath_assign_edits(path_dst_final, binary_edits_curr)
+            if blendfile_src_basename != blendfile_dst_basename:
+                if mode == 'FILE':
+                    deps_remap[blendfile_dst_basename] = deps_remap[blendfile_src_basename]
+                    del deps_remap[blendfile_src_basename]
+            del blendfile_src_basename, blendfile_dst_basename
 
-        # add to copy-list
-        # never copy libs (handled separately)
-        if not isinstance(fp, blendfile_path_walker.FPElem_block_path) or fp.userdata[0].code != b'LI':
-            path_copy_files.add((path_src, path_dst))
+        # store path mapping {dst: src}
+        if paths_remap is not None:
 
-            for file_list in (
-                    blendfile_path_walker.utils.find_sequence_paths(path_src) if fp.is_sequence else (),
-                    fp.files_siblings(),
-                    ):
+            if paths_remap_relbase is not None:
+                def relbase(fn):
+                    return os.path.relpath(fn, paths_remap_relbase)
+            else:
+                def relbase(fn):
+                    return fn
 
-                _src_dir = os.path.dirname(path_src)
-                _dst_dir = os.path.dirname(path_dst)
-                path_copy_files.update(
-                        {(os.path.join(_src_dir, f), os.path.join(_dst_dir, f))
-                         for f in file_list
-                         })
-                del _src_dir, _dst_dir
+            for src, dst in path_copy_files:
+                # TODO. relative to project-basepath
+                paths_remap[os.path.relpath(dst, base_dir_dst).decode('utf-8')] = relbase(src).decode('utf-8')
+            # main file XXX, should have better way!
+            paths_remap[os.path.basename(blendfile_src).decode('utf-8')] = relbase(blendfile_src).decode('utf-8')
 
-        if deps_remap is not None:
-            # this needs to become JSON later... ugh, need to use strings
-            deps_remap.setdefault(
-                    fp_blend_basename.decode('utf-8'),
-                    {})[path_dst_final.decode('utf-8')] = path_src_orig.decode('utf-8')
+            # blend libs
+            for dst in path_temp_files:
+                src = path_temp_files_orig[dst]
+                k = os.path.relpath(dst[:-len(TEMP_SUFFIX)], base_dir_dst_temp).decode('utf-8')
+                paths_remap[k] = relbase(src).decode('utf-8')
+                del k
 
-    del lib_visit, fp_blend_basename_last
+            del relbase
 
-    if TIMEIT:
-        print("  Time: %.4f\n" % (time.time() - t))
+        if paths_uuid is not None:
+            from bam.utils.system import uuid_from_file
 
-    yield report(("%s: %d files\n") %
-                 (colorize("\narchiving", color='bright_green'), len(path_copy_files) + 1))
+            for src, dst in path_copy_files:
+                # reports are handled again, later on.
+                try:
+                    paths_uuid[os.path.relpath(dst, base_dir_dst).decode('utf-8')] = uuid_from_file(src)
+                except FileNotFoundError:
+                    pass
+            # XXX, better way to store temp target
+            blendfile_dst_tmp = temp_remap_cb(blendfile_src, base_dir_src)
+            paths_uuid[os.path.basename(blendfile_src).decode('utf-8')] = uuid_from_file(blendfile_dst_tmp)
+
+            # blend libs
+            for dst in path_temp_files:
+                k = os.path.relpath(dst[:-len(TEMP_SUFFIX)], base_dir_dst_temp).decode('utf-8')
+                if k not in paths_uuid:
+                    if mode == 'NONE':
+                        dst = path_temp_files_orig[dst]
+                    paths_uuid[k] = uuid_from_file(dst)
+                del k
+
+            del blendfile_dst_tmp
+            del uuid_from_file
+
+        # --------------------
+        # Handle File Copy/Zip
+
+        if mode == 'FILE':
+            from concurrent.futures import as_completed
+
+            def temp_file_move(src, dst):
+                if src in path_temp_files_linked:
+                    # don't let the packed file share its data with the original,
+                    # never write into 'dst' either (it may be the original, sharing data with 'src'),
+                    # copy next to it, then replace it.
+                    import tempfile
+                    fd, dst_tmp = tempfile.mkstemp(prefix=b'.', suffix=TEMP_SUFFIX, dir=os.path.dirname(dst))
+                    os.close(fd)
+                    try:
+                        _fast_copy(src, dst_tmp)
+                        os.replace(dst_tmp, dst)
+                    except BaseException:
+                        os.remove(dst_tmp)
+                        raise
+                    os.remove(src)
+                else:
+                    shutil.move(src, dst)
 
-    # handle deps_remap and file renaming
-    if deps_remap is not None:
-        blendfile_src_basename = os.path.basename(blendfile_src).decode('utf-8')
-        blendfile_dst_basename = os.path.basename(blendfile_dst).decode('utf-8')
+            blendfile_dst_tmp = temp_remap_cb(blendfile_src, base_dir_src)
 
-        if blendfile_src_basename != blendfile_dst_basename:
-            if mode == 'FILE':
-                deps_remap[blendfile_dst_basename] = deps_remap[blendfile_src_basename]
-                del deps_remap[blendfile_src_basename]
-        del blendfile_src_basename, blendfile_dst_basename
+            # must be moved before stripping the suffix from the other temp files.
+            temp_file_move(blendfile_dst_tmp, blendfile_dst)
+            path_temp_files.remove(blendfile_dst_tmp)
 
-    # store path mapping {dst: src}
-    if paths_remap is not None:
+            # strip TEMP_SUFFIX
+            for fn in path_temp_files:
+                copy_futures[copy_executor.submit(temp_file_move, fn, fn[:-len(TEMP_SUFFIX)])] = None
 
-        if paths_remap_relbase is not None:
-            def relbase(fn):
-                return os.path.relpath(fn, paths_remap_relbase)
-        else:
-            def relbase(fn):
-                return fn
-
-        for src, dst in path_copy_files:
-            # TODO. relative to project-basepath
-            paths_remap[os.path.relpath(dst, base_dir_dst).decode('utf-8')] = relbase(src).decode('utf-8')
-        # main file XXX, should have better way!
-        paths_remap[os.path.basename(blendfile_src).decode('utf-8')] = relbase(blendfile_src).decode('utf-8')
-
-        # blend libs
-        for dst in path_temp_files:
-            src = path_temp_files_orig[dst]
-            k = os.path.relpath(dst[:-len(TEMP_SUFFIX)], base_dir_dst_temp).decode('utf-8')
-            paths_remap[k] = relbase(src).decode('utf-8')
-            del k
-
-        del relbase
-
-    if paths_uuid is not None:
-        from bam.utils.system import uuid_from_file
-
-        for src, dst in path_copy_files:
-            # reports are handled again, later on.
-            if os.path.exists(src):
-                paths_uuid[os.path.relpath(dst, base_dir_dst).decode('utf-8')] = uuid_from_file(src)
-        # XXX, better way to store temp target
-        blendfile_dst_tmp = temp_remap_cb(blendfile_src, base_dir_src)
-        paths_uuid[os.path.basename(blendfile_src).decode('utf-8')] = uuid_from_file(blendfile_dst_tmp)
-
-        # blend libs
-        for dst in path_temp_files:
-            k = os.path.relpath(dst[:-len(TEMP_SUFFIX)], base_dir_dst_temp).decode('utf-8')
-            if k not in paths_uuid:
-                if mode == 'NONE':
-                    dst = path_temp_files_orig[dst]
-                paths_uuid[k] = uuid_from_file(dst)
-            del k
-
-        del blendfile_dst_tmp
-        del uuid_from_file
-
-    # --------------------
-    # Handle File Copy/Zip
-
-    if mode == 'FILE':
-        import shutil
-        blendfile_dst_tmp = temp_remap_cb(blendfile_src, base_dir_src)
-
-        shutil.move(blendfile_dst_tmp, blendfile_dst)
-        path_temp_files.remove(blendfile_dst_tmp)
-
-        # strip TEMP_SUFFIX
-        for fn in path_temp_files:
-            shutil.move(fn, fn[:-len(TEMP_SUFFIX)])
-
-        for src, dst in path_copy_files:
-            assert(b'.blend' not in dst)
-
-            # in rare cases a filepath could point to a directory
-            if (not os.path.exists(src)) or os.path.isdir(src):
-                yield report("  %s: %r\n" % (colorize("source missing", color='red'), src))
+            # re-raise any errors from the worker threads,
+            # a missing source is found when opening it (rather than checking for each file first).
+            for future in as_completed(copy_futures):
+                item = copy_futures[future]
+                # in rare cases a filepath could point to a directory
+                if future.result() is False:
+                    yield report("  %s: %r\n" % (colorize("source missing", color='red'), item[0]))
+                elif item is not None:
+                    yield report("  %s: %r -> %r\n" % (colorize("copying", color='blue'), *item))
+
+            for src, dst, src_other in copy_dst_conflict:
+                yield report("  %s: %r -> %r (already copied from %r)\n" %
+                             (colorize("conflict", color='red'), src, dst, src_other))
+            # all copies are done, 'copy_executor' is shut down in 'finally'.
+            del copy_futures, copy_dst_visit, copy_dst_conflict
+
+            yield report("  %s: %r\n" % (colorize("written", color='green'), blendfile_dst))
+
+        elif mode == 'ZIP':
+            import zipfile
+
+            # not awesome!
+            import zlib
+            assert(compress_level in range(-1, 10))
+            _compress_level_orig = zlib.Z_DEFAULT_COMPRESSION
+            zlib.Z_DEFAULT_COMPRESSION = compress_level
+            _compress_mode = zipfile.ZIP_STORED if (compress_level == 0) else zipfile.ZIP_DEFLATED
+            if _compress_mode == zipfile.ZIP_STORED:
+                def is_compressed_filetype(fn):
+                    return False
             else:
-                yield report("  %s: %r -> %r\n" % (colorize("copying", color='blue'), src, dst))
-                shutil.copy(src, dst)
-
-        yield report("  %s: %r\n" % (colorize("written", color='green'), blendfile_dst))
-
-    elif mode == 'ZIP':
-        import shutil
-        import zipfile
-
-        # not awesome!
-        import zlib
-        assert(compress_level in range(-1, 10))
-        _compress_level_orig = zlib.Z_DEFAULT_COMPRESSION
-        zlib.Z_DEFAULT_COMPRESSION = compress_level
-        _compress_mode = zipfile.ZIP_STORED if (compress_level == 0) else zipfile.ZIP_DEFLATED
-        if _compress_mode == zipfile.ZIP_STORED:
-            def is_compressed_filetype(fn):
-                return False
-        else:
-            from bam.utils.system import is_compressed_filetype
+                from bam.utils.system import is_compressed_filetype
 
-        with zipfile.ZipFile(blendfile_dst.decode('utf-8'), 'w', _compress_mode) as zip_handle:
-            for fn in path_temp_files:
-                yield report("  %s: %r -> <archive>\n" % (colorize("copying", color='blue'), fn))
-                zip_handle.write(
-                        fn.decode('utf-8'),
-                        arcname=os.path.relpath(fn[:-1], base_dir_dst_temp).decode('utf-8'),
-                        )
-                os.remove(fn)
+            with zipfile.ZipFile(blendfile_dst.decode('utf-8'), 'w', _compress_mode) as zip_handle:
+                for fn in path_temp_files:
+                    yield report("  %s: %r -> <archive>\n" % (colorize("copying", color='blue'), fn))
+                    zip_handle.write(
+                            fn.decode('utf-8'),
+                            arcname=os.path.relpath(fn[:-1], base_dir_dst_temp).decode('utf-8'),
+                            )
+                    os.remove(fn)
 
-            shutil.rmtree(base_dir_dst_temp)
+                shutil.rmtree(base_dir_dst_temp)
 
-            for src, dst in path_copy_files:
-                assert(not dst.endswith(b'.blend'))
+                for src, dst in path_copy_files:
+                    assert(not dst.endswith(b'.blend'))
 
-                # in rare cases a filepath could point to a directory
-                if (not os.path.exists(src)) or os.path.isdir(src):
-                    yield report("  %s: %r\n" % (colorize("source missing", color='red'), src))
-                else:
-                    yield report("  %s: %r -> <archive>\n" % (colorize("copying", color='blue'), src))
-                    zip_handle.write(
-                            src.decode('utf-8'),
-                            arcname=os.path.relpath(dst, base_dir_dst).decode('utf-8'),
-                            compress_type=zipfile.ZIP_STORED if is_compressed_filetype(dst) else _compress_mode,
-                            )
+                    # in rare cases a filepath could point to a directory
+                    if (not os.path.exists(src)) or os.path.isdir(src):
+                        yield report("  %s: %r\n" % (colorize("source missing", color='red'), src))
+                    else:
+                        yield report("  %s: %r -> <archive>\n" % (colorize("copying", color='blue'), src))
+                        zip_handle.write(
+                                src.decode('utf-8'),
+                                arcname=os.path.relpath(dst, base_dir_dst).decode('utf-8'),
+                                compress_type=zipfile.ZIP_STORED if is_compressed_filetype(dst) else _compress_mode,
+                                )
 
-        zlib.Z_DEFAULT_COMPRESSION = _compress_level_orig
-        del _compress_level_orig, _compress_mode
+            zlib.Z_DEFAULT_COMPRESSION = _compress_level_orig
+            del _compress_level_orig, _compress_mode
 
-        yield report("  %s: %r\n" % (colorize("written", color='green'), blendfile_dst))
-    elif mode == 'NONE':
-        pass
-    else:
-        raise Exception("%s not a known mode" % mode)
+            yield report("  %s: %r\n" % (colorize("written", color='green'), blendfile_dst))
+        elif mode == 'NONE':
+            pass
+        else:
+            raise Exception("%s not a known mode" % mode)
+    finally:
+        # when scanning fails or the caller stops early (GeneratorExit),
+        # don't let queued copies keep writing into the destination.
+        if copy_executor is not None:
+            copy_executor.shutdown(wait=True, cancel_futures=True)
 
 
 def create_argparse():
-    import os
     import argparse
 
     usage_text = (
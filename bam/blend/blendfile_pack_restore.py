@@ -26,6 +26,8 @@ This script takes Blend-File and remaps their paths to the original locations.
 
 VERBOSE = 1
 
+import sys
+
 from bam.blend import blendfile_path_walker
 
 
@@ -50,6 +52,9 @@ def blendfile_remap(
 
         return filepath_tmp
 
+    # avoid looking up 'sys.stdout' for each path.
+    stdout_write = sys.stdout.write
+
     for fp, (rootdir, fp_blend_basename) in blendfile_path_walker.FilePath.visit_from_blend(
             blendfile_src,
             readonly=False,
@@ -68,14 +73,14 @@ def blendfile_remap(
             if path_src_orig is not None:
                 fp.filepath = path_src_orig
                 if VERBOSE:
-                    print("  Remapping:", path_dst_final_b, "->", path_src_orig)
+                    stdout_write("  Remapping: %s -> %s\n" % (path_dst_final_b, path_src_orig))
         else:
             path_dst_final = path_dst_final_b.decode('utf-8')
             path_src_orig = deps_remap.get(path_dst_final)
             if path_src_orig is not None:
                 fp.filepath = path_src_orig.encode('utf-8')
                 if VERBOSE:
-                    print("  Remapping:", path_dst_final, "->", path_src_orig)
+                    stdout_write("  Remapping: %s -> %s\n" % (path_dst_final, path_src_orig))
 
 
 def pack_restore(blendfile_dir_src, blendfile_dir_dst, pathmap):
@@ -19,8 +19,12 @@
 # ***** END GPL LICENCE BLOCK *****
 
 import os
-# gives problems with scripts that use stdout, for testing 'bam deps' for eg.
-VERBOSE = False  # os.environ.get('BAM_VERBOSE', False)
+import functools
+import logging
+from collections import defaultdict
+
+from bam.blend import blendfile
+
 TIMEIT = False
 
 USE_ALEMBIC_BRANCH = True
@@ -62,16 +66,34 @@ class C_defs:
         CACHE_LIBRARY_SOURCE_CACHE = 1
 
 
-if VERBOSE:
-    import logging
-    log_deps = logging.getLogger("path_walker")
-    del logging
+# debug output is logged (not printed),
+# printing gives problems with scripts that use stdout, for testing 'bam deps' for eg.
+log_deps = logging.getLogger("path_walker")
 
-    def set_as_str(s):
-        if s is None:
-            return "None"
-        else:
-            return (", ".join(sorted(i.decode('ascii') for i in sorted(s))))
+
+def set_as_str(s):
+    if s is None:
+        return "None"
+    else:
+        # names (bytes) or addresses (int)
+        return (", ".join(i.decode('ascii') if isinstance(i, bytes) else str(i) for i in sorted(s)))
+
+
+def path_as_str(path):
+    # for display, paths may not be valid utf-8
+    return path.decode('utf-8', errors='surrogateescape')
+
+
+@functools.lru_cache(maxsize=1024)
+def _filepath_basedir_cached(filepath):
+    """
+    Return the normalized (absolute) filepath and its directory.
+
+    Libraries are often linked many times, avoid re-calculating this each visit.
+    Only pass in absolute paths, relative paths depend on the current working directory.
+    """
+    filepath = os.path.normpath(filepath)
+    return filepath, os.path.dirname(filepath)
 
 
 class FPElem:
@@ -172,6 +194,9 @@ class FPElem_block_path(FPElem):
         block, path = self.userdata
         self._filepath_assign_edits(block, path, filepath, binary_edits)
 
+    # bind the callbacks directly (avoids forwarding through 'FPElem.filepath').
+    filepath = property(_get_cb, _set_cb)
+
 
 class FPElem_sequence_single(FPElem):
     """
@@ -198,6 +223,8 @@ class FPElem_sequence_single(FPElem):
         self._filepath_assign_edits(block, path, head + sep, binary_edits)
         self._filepath_assign_edits(sub_block, sub_path, tail, binary_edits)
 
+    filepath = property(_get_cb, _set_cb)
+
 
 class FPElem_sequence_image_seq(FPElem_sequence_single):
     """
@@ -214,6 +241,17 @@ class FPElem_sequence_image_seq(FPElem_sequence_single):
         return files
 
 
+# block codes not scanned for paths by FilePath.visit_from_blend
+_SCAN_CODES_SKIP = frozenset((
+    # libraries handled separately
+    b'LI',
+    b'ID',
+    # unneeded
+    b'WM',
+    b'SN',  # bScreen
+    ))
+
+
 class FilePath:
     __slots__ = ()
 
@@ -252,25 +290,23 @@ class FilePath:
             blendfile_level_cb=(None, None),
             ):
         # print(level, block_codes)
-        import os
+        if not os.path.isabs(filepath):
+            filepath = os.path.abspath(filepath)
+        filepath, basedir = _filepath_basedir_cached(filepath)
 
-        filepath = os.path.abspath(filepath)
-
-        if VERBOSE:
+        # only build log messages when they're used
+        use_log = log_deps.isEnabledFor(logging.DEBUG)
+        if use_log:
             indent_str = "  " * level
-            # print(indent_str + "Opening:", filepath)
-            # print(indent_str + "... blocks:", block_codes)
-
-            log_deps.info("~")
-            log_deps.info("%s%s" % (indent_str, filepath.decode('utf-8')))
-            log_deps.info("%s%s" % (indent_str, set_as_str(block_codes)))
+            log_deps.debug("~")
+            log_deps.debug("%s%s", indent_str, path_as_str(filepath))
+            log_deps.debug("%s%s", indent_str, set_as_str(block_codes))
 
         blendfile_level_cb_enter, blendfile_level_cb_exit = blendfile_level_cb
 
         if blendfile_level_cb_enter is not None:
             blendfile_level_cb_enter(filepath)
 
-        basedir = os.path.dirname(filepath)
         if rootdir is None:
             rootdir = basedir
 
@@ -285,7 +321,7 @@ class FilePath:
             # note: we could *almost* id_name, however this isn't unique for libraries.
             expand_addr_visit = set()
             # {lib_id: {block_ids... }}
-            expand_codes_idlib = {}
+            expand_codes_idlib = defaultdict(set)
 
             # libraries used by this blend
             block_codes_idlib = set()
@@ -296,18 +332,20 @@ class FilePath:
             lib_block_codes_existing = lib_visit.setdefault(filepath, set())
 
             # only for this block
-            def _expand_codes_add_test(block, code):
+            def _expand_codes_add_test(block, code, id_name=None):
                 # return True, if the ID should be searched further
+                # id_name: when already known (avoids reading it again)
                 #
                 # we could investigate a better way...
                 # Not to be accessing ID blocks at this point. but its harmless
                 if code == b'ID':
                     assert(code == block.code)
                     if recursive:
-                        expand_codes_idlib.setdefault(block[b'lib'], set()).add(block[b'name'])
+                        expand_codes_idlib[block[b'lib']].add(block[b'name'])
                     return False
                 else:
-                    id_name = block[b'id', b'name']
+                    if id_name is None:
+                        id_name = block[b'id', b'name']
 
                     # if we touched this already, don't touch again
                     # (else we may modify the same path multiple times)
@@ -324,18 +362,19 @@ class FilePath:
 
                     # instead just don't operate on blocks multiple times
                     # ... rather than attempt to check on what we need or not.
-                    len_prev = len(lib_block_codes_existing)
-                    lib_block_codes_existing.add(id_name)
-                    if len_prev == len(lib_block_codes_existing):
+                    if id_name in lib_block_codes_existing:
                         return False
+                    lib_block_codes_existing.add(id_name)
 
-                    len_prev = len(expand_addr_visit)
-                    expand_addr_visit.add(block.addr_old)
-                    return (len_prev != len(expand_addr_visit))
+                    addr_old = block.addr_old
+                    if addr_old in expand_addr_visit:
+                        return False
+                    expand_addr_visit.add(addr_old)
+                    return True
 
-            def block_expand(block, code):
+            def block_expand(block, code, id_name=None):
                 assert(block.code == code)
-                if _expand_codes_add_test(block, code):
+                if _expand_codes_add_test(block, code, id_name):
                     yield block
 
                     assert(block.code == code)
@@ -356,7 +395,7 @@ class FilePath:
             # never set
             block_codes_idlib = None
 
-            def block_expand(block, code):
+            def block_expand(block, code, id_name=None):
                 assert(block.code == code)
                 yield block
 
@@ -374,14 +413,19 @@ class FilePath:
         else:
             def iter_blocks_id(code):
                 for block in blend.find_blocks_from_code(code):
-                    if block[b'id', b'name'] in block_codes:
-                        yield from block_expand(block, code)
+                    id_name = block[b'id', b'name']
+                    if id_name in block_codes:
+                        yield from block_expand(block, code, id_name)
 
             if block_codes_idlib is not None:
                 def iter_blocks_idlib():
                     for block in blend.find_blocks_from_code(b'LI'):
+                        # use the path resolved when looking into libraries (avoid reading it again).
+                        lib_path = lib_path_from_offset.get(block.addr_old)
+                        if lib_path is None:
+                            lib_path = block[b'name']
                         # TODO, this should work but in fact mades some libs not link correctly.
-                        if block[b'name'] in block_codes_idlib:
+                        if lib_path in block_codes_idlib:
                             yield from block_expand(block, b'LI')
             else:
                 def iter_blocks_idlib():
@@ -395,47 +439,57 @@ class FilePath:
         # store info to pass along with each iteration
         extra_info = rootdir, os.path.basename(filepath)
 
-        from bam.blend import blendfile
-        with blendfile.open_blend(filepath_tmp, "rb" if readonly else "r+b") as blend:
+        # {lib_id: lib_path}, filled in when looking into libraries
+        lib_path_from_offset = {}
 
-            for code in blend.code_index.keys():
-                # handle library blocks as special case
-                if ((len(code) != 2) or
-                    (code in {
-                        # libraries handled below
-                        b'LI',
-                        b'ID',
-                        # unneeded
-                        b'WM',
-                        b'SN',  # bScreen
-                        })):
+        # look up FilePath.from_block handlers directly (avoids a generator per block).
+        # when expanding, blocks of other codes are included (so look up the handler for each block),
+        # otherwise all blocks share the code, codes without a handler can be skipped entirely.
+        from_block_dict = FilePath._from_block_dict
+        from_block_per_code = (expand_addr_visit is None)
 
-                    continue
+        with blendfile.open_blend(filepath_tmp, "rb" if readonly else "r+b") as blend:
 
-                # if VERBOSE:
-                #     print("  Scanning", code)
+            # handle library blocks as special case (below)
+            scan_codes = [code for code in blend.code_index.keys()
+                          if (len(code) == 2) and (code not in _SCAN_CODES_SKIP)]
 
-                for block in iter_blocks_id(code):
-                    yield from FilePath.from_block(block, basedir, extra_info, level)
+            for code in scan_codes:
+                if use_log:
+                    log_deps.debug("%s  Scanning %s", indent_str, code.decode('ascii'))
+
+                if from_block_per_code:
+                    fn = from_block_dict.get(code)
+                    if fn is None:
+                        continue
+                    for block in iter_blocks_id(code):
+                        yield from fn(block, basedir, extra_info, level)
+                else:
+                    for block in iter_blocks_id(code):
+                        fn = from_block_dict.get(block.code)
+                        if fn is not None:
+                            yield from fn(block, basedir, extra_info, level)
 
             # print("A:", expand_addr_visit)
             # print("B:", block_codes)
-            if VERBOSE:
-                log_deps.info("%s%s" % (indent_str, set_as_str(expand_addr_visit)))
+            if use_log:
+                log_deps.debug("%s%s", indent_str, set_as_str(expand_addr_visit))
 
             if recursive:
 
                 if expand_codes_idlib is None:
-                    expand_codes_idlib = {}
+                    expand_codes_idlib = defaultdict(set)
                     for block in blend.find_blocks_from_code(b'ID'):
-                        expand_codes_idlib.setdefault(block[b'lib'], set()).add(block[b'name'])
+                        expand_codes_idlib[block[b'lib']].add(block[b'name'])
 
                 # look into libraries
                 lib_all = []
 
                 for lib_id, lib_block_codes in sorted(expand_codes_idlib.items()):
                     lib = blend.find_block_from_offset(lib_id)
-                    lib_path = lib[b'name']
+                    # store for 'iter_blocks_idlib' (avoid reading it again).
+                    lib_path = lib_path_from_offset[lib_id] = lib[b'name']
+                    del lib
 
                     # get all data needed to read the blend files here (it will be freed!)
                     # lib is an address at the moment, we only use as a way to group
@@ -465,7 +519,9 @@ class FilePath:
                 # if we visited this before,
                 # check we don't follow the same links more than once
                 lib_block_codes_existing = lib_visit.setdefault(lib_path_abs, set())
-                lib_block_codes -= lib_block_codes_existing
+                # new set (rather than in-place), only iterates over the (typically small) requested codes,
+                # not all codes visited so far.
+                lib_block_codes = lib_block_codes - lib_block_codes_existing
 
                 # don't touch them again
                 # XXX, this is now maintained in "_expand_generic_material"
@@ -474,19 +530,22 @@ class FilePath:
                 # print("looking for", lib_block_codes)
 
                 if not lib_block_codes:
-                    if VERBOSE:
-                        print((indent_str + "  "), "Library Skipped (visited): ", filepath, " -> ", lib_path_abs, sep="")
+                    if use_log:
+                        log_deps.debug("%s  Library Skipped (visited): %s -> %s",
+                                       indent_str, path_as_str(filepath), path_as_str(lib_path_abs))
                     continue
 
                 if not os.path.exists(lib_path_abs):
-                    if VERBOSE:
-                        print((indent_str + "  "), "Library Missing: ", filepath, " -> ", lib_path_abs, sep="")
+                    if use_log:
+                        log_deps.debug("%s  Library Missing: %s -> %s",
+                                       indent_str, path_as_str(filepath), path_as_str(lib_path_abs))
                     continue
 
                 # import IPython; IPython.embed()
-                if VERBOSE:
-                    print((indent_str + "  "), "Library: ", filepath, " -> ", lib_path_abs, sep="")
-                    # print((indent_str + "  "), lib_block_codes)
+                if use_log:
+                    log_deps.debug("%s  Library: %s -> %s",
+                                   indent_str, path_as_str(filepath), path_as_str(lib_path_abs))
+                    log_deps.debug("%s  %s", indent_str, set_as_str(lib_block_codes))
                 yield from FilePath.visit_from_blend(
                         lib_path_abs,
                         readonly=readonly,
@@ -627,14 +686,22 @@ class bf_utils:
 
     def iter_array(block, length=-1):
         assert(block.code == b'DATA')
-        from bam.blend import blendfile
-        import os
+        if length <= 0:
+            return
         handle = block.file.handle
         header = block.file.header
 
-        for i in range(length):
-            block.file.handle.seek(block.file_offset + (header.pointer_size * i), os.SEEK_SET)
-            offset = blendfile.DNA_IO.read_pointer(handle, header)
+        if header.pointer_size == 4:
+            st = blendfile.DNA_IO.UINT[header.endian_index]
+        else:
+            st = blendfile.DNA_IO.ULONG[header.endian_index]
+
+        # read all pointers at once
+        # (the handle may be used by the caller between each step).
+        handle.seek(block.file_offset, os.SEEK_SET)
+        data = handle.read(st.size * length)
+
+        for (offset,) in st.iter_unpack(data):
             sub_block = block.file.find_block_from_offset(offset)
             yield sub_block
 
@@ -878,7 +945,13 @@ class utils:
 
     @staticmethod
     def abspath(path, start, library=None):
-        import os
+        # 'library' is unused, keep it out of the cache key.
+        return utils._abspath_cached(path, start)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _abspath_cached(path, start):
+        # the same paths are often used by many blocks (images shared between materials for eg).
         if path.startswith(b'//'):
             # if library:
             #     start = os.path.dirname(abspath(library.filepath))
@@ -900,12 +973,10 @@ class utils:
         """
         Splits the path using either slashes
         """
-        split1 = path.rpartition(b'/')
-        split2 = path.rpartition(b'\\')
-        if len(split1[0]) > len(split2[0]):
-            return split1
-        else:
-            return split2
+        i = max(path.rfind(b'/'), path.rfind(b'\\'))
+        if i == -1:
+            return b'', b'', path
+        return path[:i], path[i:i + 1], path[i + 1:]
 
     def find_sequence_paths(filepath, use_fullpath=True):
         # supports str, byte paths
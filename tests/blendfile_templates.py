@@ -5,6 +5,10 @@
 #    blender --python blendfile_templates.py -- destination/file.blend create_command return_code
 #
 # 'return_code' can be any number, use to check the script completes.
+#
+# Or to create many files with a single Blender instance (see 'worker'):
+#
+#    blender --python blendfile_templates.py -- --worker
 
 
 def _clear_blend():
@@ -125,20 +129,19 @@ def create_from_file_liblinks(blendfile_root, create_data, deps):
                 tuple(sorted({f for f, f_id, f_links in create_data} - done)))
 
 
-if __name__ == "__main__":
-    import sys
-    blendfile, blendfile_root, blendfile_deps_json, create_id, create_data, returncode = sys.argv[-6:]
-    returncode = int(returncode)
-    create_fn = globals()[create_id]
+def create(blendfile, blendfile_root, create_id, create_data, reset=False):
+    """
+    Create a blend file using one of the create functions,
+    returns its dependencies.
 
-    if create_data != "NONE":
-        with open(create_data, 'r') as f:
-            import json
-            create_data = json.load(f)
-            del json
+    :arg reset: Reset to factory settings first (when creating multiple files).
+    """
+    create_fn = globals()[create_id]
 
     # ----
     import bpy
+    if reset:
+        bpy.ops.wm.read_factory_settings()
     # no need for blend1's
     bpy.context.user_preferences.filepaths.save_version = 0
     # WEAK! (but needed)
@@ -152,6 +155,69 @@ if __name__ == "__main__":
 
     create_fn(blendfile_root, create_data, deps)
 
+    import bpy
+    bpy.ops.wm.save_mainfile('EXEC_DEFAULT', filepath=blendfile)
+
+    return deps
+
+
+# written before each result of 'worker'
+# (the line can be found among Blender's own output).
+WORKER_RESULT_PREFIX = "BAM_TEMPLATE_RESULT:"
+
+
+def worker():
+    """
+    Create blend files for each request read from stdin,
+    so Blender doesn't need to be started for every file.
+
+    Requests are JSON objects (one per line),
+    with the keys: "blendfile", "blendfile_root", "create_id", "create_data".
+
+    A result line is written for each: WORKER_RESULT_PREFIX + JSON object,
+    with the keys: "deps" (None on failure), "error".
+    """
+    import sys
+    import json
+    import traceback
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            deps = create(
+                    request["blendfile"],
+                    request["blendfile_root"],
+                    request["create_id"],
+                    request["create_data"],
+                    reset=True,
+                    )
+            result = {"deps": deps, "error": ""}
+        except Exception:
+            result = {"deps": None, "error": traceback.format_exc()}
+
+        # start on a new line, in case Blender's output didn't end with one.
+        sys.stdout.write("\n" + WORKER_RESULT_PREFIX + json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[-1] == "--worker":
+        worker()
+        sys.exit(0)
+
+    blendfile, blendfile_root, blendfile_deps_json, create_id, create_data, returncode = sys.argv[-6:]
+    returncode = int(returncode)
+
+    if create_data != "NONE":
+        with open(create_data, 'r') as f:
+            import json
+            create_data = json.load(f)
+            del json
+
+    deps = create(blendfile, blendfile_root, create_id, create_data)
+
     if deps:
         with open(blendfile_deps_json, 'w') as f:
             import json
@@ -163,8 +229,4 @@ if __name__ == "__main__":
                     )
             del json
 
-    import bpy
-    bpy.ops.wm.save_mainfile('EXEC_DEFAULT', filepath=blendfile)
-
-    import sys
     sys.exit(returncode)
@@ -24,33 +24,17 @@ if VERBOSE:
 
 # ------------------
 # Ensure module path
+# (bam & the webservice application)
 import os
 import sys
-path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
-if path not in sys.path:
-    sys.path.append(path)
-del os, sys, path
-# --------
-
-
-# ------------------
-# Ensure module path
-import os
-import sys
-path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "webservice", "bam"))
-if path not in sys.path:
-    sys.path.append(path)
-del os, sys, path
-# --------
-
-
-# -------------------------
-# Quiet the werkzeug logger
-if not VERBOSE:
-    import werkzeug
-    import werkzeug._internal
-    werkzeug._internal._log = lambda *a, **b: None
-    del werkzeug
+base = os.path.dirname(os.path.abspath(__file__))
+for path in (
+        os.path.normpath(os.path.join(base, "..")),
+        os.path.normpath(os.path.join(base, "..", "webservice", "bam")),
+        ):
+    if path not in sys.path:
+        sys.path.append(path)
+del os, sys, base, path
 # --------
 
 
@@ -67,16 +51,16 @@ if 1:
     import sys
 
     def exit(status):
-        import io
         globals().update(sys.exit.exit_data)
-        if isinstance(sys.stdout, io.StringIO):
+        # streams replaced by 'StdIO' are marked,
+        # stdout may not be captured (see 'StdIO.capture_stdout')
+        if getattr(sys.stderr, "_bam_captured", False):
 
             _stdout.write("\nsys.exit(%d) with message:\n" % status)
 
-            sys.stdout.seek(0)
-            sys.stderr.seek(0)
-            _stdout.write(sys.stdout.read())
-            _stderr.write(sys.stderr.read())
+            if getattr(sys.stdout, "_bam_captured", False):
+                _stdout.write(sys.stdout.getvalue())
+            _stderr.write(sys.stderr.getvalue())
 
             _stdout.write("\n")
 
@@ -121,15 +105,36 @@ del argparse
 
 import os
 import sys
+import io
 import shutil
+import shlex
 import json
+import logging
+import subprocess
+
+import bam.cli
 
 TEMP_LOCAL = "/tmp/bam_test"
 # Separate tmp directory for server, since we don't reset the server at every test
 TEMP_SERVER = "/tmp/bam_test_server"
+# Copy of the SVN repository & checkout each session test starts with
+# (created once, set 'BAM_TEST_NO_SNAPSHOT' to create them for every test).
+TEMP_SNAPSHOT = "/tmp/bam_test_snapshot"
+USE_SNAPSHOT = not os.environ.get("BAM_TEST_NO_SNAPSHOT")
 PORT = 5555
 PROJECT_NAME = "test_project"
 
+# Running tests in parallel processes (pytest-xdist: 'gw0', 'gw1', ...),
+# each process needs its own directories & server port.
+# (tests within a process can't run in parallel, bam changes the current directory).
+_worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+if _worker_id:
+    TEMP_LOCAL += "_" + _worker_id
+    TEMP_SERVER += "_" + _worker_id
+    TEMP_SNAPSHOT += "_" + _worker_id
+    PORT += 1 + int(_worker_id.lstrip("gw") or 0)
+del _worker_id
+
 # running scripts next to this one!
 CURRENT_DIR = os.path.dirname(__file__)
 
@@ -150,24 +155,51 @@ def args_as_string(args):
     """
     Print args so we can paste them to run them again.
     """
-    import shlex
     return " ".join([shlex.quote(c) for c in args])
 
 
-def run(cmd, cwd=None):
+# Shared for all output we don't need (see 'StdIO').
+_DEVNULL = open(os.devnull, 'w')
+
+
+def run(cmd, cwd=None, capture=True):
+    """
+    When ``capture`` is False, stdout is only read on failure (otherwise returned as empty bytes),
+    so the output of successful commands isn't read through a pipe.
+    """
     if VERBOSE:
         print(">>> ", args_as_string(cmd))
-    import subprocess
+    if capture:
+        stdout_file = None
+    else:
+        # written directly by the sub-process, only read back to report failure.
+        import tempfile
+        stdout_file = tempfile.TemporaryFile()
     kwargs = {
         "stderr": subprocess.PIPE,
-        "stdout": subprocess.PIPE,
+        "stdout": subprocess.PIPE if capture else stdout_file,
         }
     if cwd is not None:
         kwargs["cwd"] = cwd
+    else:
+        # let subprocess use 'posix_spawn' (avoids forking the test process),
+        # this needs the executable's path, no 'cwd' & not closing file descriptors
+        # (which are non-inheritable by default anyway).
+        executable = shutil.which(cmd[0])
+        if executable is not None:
+            kwargs["executable"] = executable
+            kwargs["close_fds"] = False
 
     proc = subprocess.Popen(cmd, **kwargs)
     stdout, stderr = proc.communicate()
     returncode = proc.returncode
+    if stdout_file is not None:
+        with stdout_file:
+            if returncode != 0:
+                stdout_file.seek(0)
+                stdout = stdout_file.read()
+            else:
+                stdout = b''
 
     if VERBOSE:
         sys.stdout.write("   stdout:  %s\n" % stdout.strip())
@@ -178,7 +210,9 @@ def run(cmd, cwd=None):
 
 
 def run_check(cmd, cwd=None, returncode_ok=(0,)):
-    stdout, stderr, returncode = run(cmd, cwd)
+    # only the return code is checked, stdout is only needed for verbose output
+    # (or to report failure, which 'run' handles).
+    stdout, stderr, returncode = run(cmd, cwd, capture=bool(VERBOSE))
     if returncode in returncode_ok:
         return True
 
@@ -212,21 +246,31 @@ class StdIO:
     __slots__ = (
         "stdout",
         "stderr",
+        # when False, stdout is discarded (read as an empty string)
+        "capture_stdout",
         )
 
-    def __init__(self):
+    def __init__(self, capture_stdout=True):
         self.stdout = sys.stdout
         self.stderr = sys.stderr
+        self.capture_stdout = capture_stdout
 
     def read(self):
-        sys.stdout.seek(0)
-        sys.stderr.seek(0)
-        return sys.stdout.read(), sys.stderr.read()
+        # 'getvalue' doesn't move the stream position (unlike seek & read).
+        if self.capture_stdout:
+            return sys.stdout.getvalue(), sys.stderr.getvalue()
+        else:
+            return "", sys.stderr.getvalue()
 
     def __enter__(self):
-        import io
-        sys.stdout = io.StringIO()
+        # mark the captured streams (see the 'sys.exit' override)
+        if self.capture_stdout:
+            sys.stdout = io.StringIO()
+            sys.stdout._bam_captured = True
+        else:
+            sys.stdout = _DEVNULL
         sys.stderr = io.StringIO()
+        sys.stderr._bam_captured = True
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
@@ -238,27 +282,29 @@ class StdIO:
 
 
 def svn_repo_create(id_, dirname):
-    return run_check(["svnadmin", "create", id_], cwd=dirname)
+    return run_check(["svnadmin", "create", os.path.join(dirname, id_)])
 
 
 def svn_repo_checkout(repo, path):
-    return run_check(["svn", "checkout", repo, path])
+    # the (empty) checkout is only used by the server, no need to list files.
+    return run_check(["svn", "checkout", "--quiet", repo, path])
 
 
-def bam_run(argv, cwd=None):
+def bam_run(argv, cwd=None, capture=False):
+    """
+    :arg capture: When False, stdout is discarded (returned as an empty string),
+       most commands only check stderr, pass True to check the output.
+    """
     with CHDir(cwd):
-        import bam.cli
-
         if VERBOSE:
             sys.stdout.write("\n  running:  ")
             if cwd is not None:
                 sys.stdout.write("cd %r ; " % cwd)
-            import shlex
             sys.stdout.write("bam %s\n" % " ".join([shlex.quote(c) for c in argv]))
 
             # input('press_key!:')
 
-        with StdIO() as fakeio:
+        with StdIO(capture_stdout=capture) as fakeio:
             bam.cli.main(argv)
             ret = fakeio.read()
 
@@ -270,14 +316,13 @@ def bam_run(argv, cwd=None):
 
 
 def bam_run_as_json(argv, cwd=None):
-    stdout, stderr = bam_run(argv, cwd=cwd)
+    stdout, stderr = bam_run(argv, cwd=cwd, capture=True)
     if stderr:
         raise Exception(stderr)
         return None
 
     ret = None
 
-    import json
     try:
         ret = json.loads(stdout)
     except Exception as e:
@@ -295,11 +340,10 @@ def file_quick_write(path, filepart=None, data=None, append=False):
     if data is None:
         data = b''
 
-    mode = 'a' if append else 'w'
     if type(data) is bytes:
-        mode = mode + 'b'
-    elif type(data) is str:
         pass
+    elif type(data) is str:
+        data = data.encode('utf-8')
     else:
         raise Exception("type %r not known" % type(data))
 
@@ -307,8 +351,16 @@ def file_quick_write(path, filepart=None, data=None, append=False):
         path = os.path.join(path, filepart)
 
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, mode) as f:
-        f.write(data)
+
+    # write to the file descriptor directly (no file object for such small writes)
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_APPEND if append else os.O_TRUNC)
+    fd = os.open(path, flags, 0o666)
+    try:
+        data = memoryview(data)
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
 
 
 def file_quick_read(path, filepart=None, mode='rb'):
@@ -376,64 +428,120 @@ def _dbg_dump_path(path):
     print("\n".join(sorted(stdout.decode('utf-8').split("\n"))))
 
 
+class BlenderWorker:
+    """
+    Blender running 'blendfile_templates.py' as a worker,
+    creating blend files on request (instead of starting Blender for each file).
+    """
+    __slots__ = (
+        "proc",
+        )
+
+    def __init__(self):
+        blender = os.getenv('BLENDER_BIN', "blender")
+        cmd = (
+            blender,
+            "--background",
+            "--factory-startup",
+            "-noaudio",
+            "--python",
+            os.path.join(CURRENT_DIR, "blendfile_templates.py"),
+            "--",
+            "--worker",
+            )
+        if VERBOSE:
+            print(">>> ", args_as_string(cmd))
+        self.proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                )
+
+    def is_alive(self):
+        return self.proc.poll() is None
+
+    def create(self, blendfile, blendfile_root, create_id, create_data):
+        """
+        Returns (deps, output), where deps is None on failure.
+        """
+        from blendfile_templates import WORKER_RESULT_PREFIX
+        # the pipes are binary: the result is parsed from bytes
+        # and Blender's output is only decoded once.
+        result_prefix = WORKER_RESULT_PREFIX.encode('utf-8')
+
+        request = {
+            "blendfile": blendfile,
+            "blendfile_root": blendfile_root,
+            "create_id": create_id,
+            "create_data": create_data,
+            }
+        try:
+            self.proc.stdin.write(json.dumps(request).encode('utf-8') + b"\n")
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            return None, ""
+
+        output = []
+        for line in self.proc.stdout:
+            i = line.find(result_prefix)
+            if i != -1:
+                output.append(line[:i])
+                result = json.loads(line[i + len(result_prefix):])
+                return result["deps"], b"".join(output).decode('utf-8', 'replace') + result["error"]
+            output.append(line)
+
+        # Blender exited
+        return None, b"".join(output).decode('utf-8', 'replace')
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+# started on first use, see 'blender_worker'.
+# module level (not per test class): the helpers creating blend files
+# are used by many test classes, which can all share one Blender process.
+_blender_worker = None
+
+
+def blender_worker():
+    """
+    Return the Blender worker shared by all tests (restarting it if needed).
+    """
+    global _blender_worker
+    if _blender_worker is None or not _blender_worker.is_alive():
+        _blender_worker = BlenderWorker()
+    return _blender_worker
+
+
+def blender_worker_close():
+    global _blender_worker
+    if _blender_worker is not None:
+        _blender_worker.close()
+        _blender_worker = None
+
+
 def blendfile_template_create(blendfile, blendfile_root, create_id, create_data, deps):
-    returncode_test = 123
-    blendfile_deps_json = os.path.join(TEMP_LOCAL, "blend_template_deps.json")
     os.makedirs(os.path.dirname(blendfile), exist_ok=True)
 
-    if create_data is not None:
-        blendfile_create_data_json = os.path.join(TEMP_LOCAL, "blendfile_create_data.json")
-        with open(blendfile_create_data_json, 'w') as f:
-            import json
-            json.dump(
-                    create_data, f, ensure_ascii=False,
-                    check_circular=False,
-                    # optional (pretty)
-                    sort_keys=True, indent=4, separators=(',', ': '),
-                    )
-            del json
-    else:
-        blendfile_create_data_json = None
-
-    blender = os.getenv('BLENDER_BIN', "blender")
-    cmd = (
-        blender,
-        "--background",
-        "--factory-startup",
-        "-noaudio",
-        "--python",
-        os.path.join(CURRENT_DIR, "blendfile_templates.py"),
-        "--",
-        blendfile,
-        blendfile_root,
-        blendfile_deps_json,
-        create_id,
-        "NONE" if blendfile_create_data_json is None else blendfile_create_data_json,
-        str(returncode_test),
-        )
-    stdout, stderr, returncode = run(cmd)
+    if VERBOSE:
+        print(">>> ", "create: %s %r" % (create_id, blendfile))
 
-    if os.path.exists(blendfile_deps_json):
-        with open(blendfile_deps_json, 'r') as f:
-            import json
-            deps[:] = json.load(f)
-            del json
-        os.remove(blendfile_deps_json)
-    else:
-        deps.clear()
+    deps_create, output = blender_worker().create(blendfile, blendfile_root, create_id, create_data)
 
-    if blendfile_create_data_json is not None:
-        os.remove(blendfile_create_data_json)
+    if VERBOSE:
+        sys.stdout.write("   output:  %s\n" % output.strip())
 
-    if returncode != returncode_test:
+    if deps_create is None:
+        deps.clear()
         # verbose will have already printed
         if not VERBOSE:
-            print(">>> ", args_as_string(cmd))
-            sys.stdout.write("   stdout:  %s\n" % stdout.strip())
-            sys.stdout.write("   stderr:  %s\n" % stderr.strip())
-            sys.stdout.write("   return:  %d\n" % returncode)
+            print(">>> ", "create: %s %r" % (create_id, blendfile))
+            sys.stdout.write("   output:  %s\n" % output.strip())
         return False
     else:
+        deps[:] = deps_create
         return True
 
 
@@ -499,64 +607,136 @@ def wait_for_input():
 
 def server(mode='testing', debug=False):
     """
-    Start development server via Flask app.run() in a separate thread. We need server
+    Start development server (serving the Flask app) in a separate thread. We need server
     to run in order to check most of the client commands.
+
+    The server shares the process with the client being tested,
+    which replaces 'sys.stdout' & 'sys.stderr' (see 'StdIO') and changes directory (see 'CHDir').
+    So server errors & logging are written to the streams bound here,
+    and the server must only use absolute paths (as the project paths & 'TEMP_SERVER' are).
+
+    Returns data to pass to 'server_stop'.
     """
 
-    def run_testing_server():
-        from application import app
-
-        # If we run the server in testing mode (the default) we override sqlite database,
-        # with a testing, disposable one (create TMP dir)
-        if mode == 'testing':
-            from application import db
-            from application.modules.projects.model import Project, ProjectSetting
-            # Override sqlite database
-            if not os.path.isdir(TEMP_SERVER):
-                os.makedirs(TEMP_SERVER)
-            app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + TEMP_SERVER + '/bam_test.db'
-            # Use the model definitions to create all the tables
-            db.create_all()
-            # Create a testing project, based on the global configuration (depends on a
-            # correct initialization of the SVN repo and on the creation of a checkout)
-
-            # TODO(fsiddi): turn these values in variables
-            project = Project(
-                name=PROJECT_NAME,
-                repository_path=os.path.join(TEMP_LOCAL, "remote_store/svn_checkout"),
-                upload_path=os.path.join(TEMP_LOCAL, "remote_store/upload"),
-                status="active",
+    from application import app
+
+    # If we run the server in testing mode (the default) we override sqlite database,
+    # with a testing, disposable one (create TMP dir)
+    if mode == 'testing':
+        from application import db
+        from application.modules.projects.model import Project, ProjectSetting
+        # Override sqlite database
+        os.makedirs(TEMP_SERVER, exist_ok=True)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + TEMP_SERVER + '/bam_test.db'
+        # Use the model definitions to create all the tables
+        db.create_all()
+        # Create a testing project, based on the global configuration (depends on a
+        # correct initialization of the SVN repo and on the creation of a checkout)
+
+        # TODO(fsiddi): turn these values in variables
+        project = Project(
+            name=PROJECT_NAME,
+            repository_path=os.path.join(TEMP_LOCAL, "remote_store/svn_checkout"),
+            upload_path=os.path.join(TEMP_LOCAL, "remote_store/upload"),
+            status="active",
+            )
+        db.session.add(project)
+        db.session.commit()
+
+        setting = ProjectSetting(
+                project_id=project.id,
+                name="svn_password",
+                value="my_password",
+                data_type="str",
                 )
-            db.session.add(project)
-            db.session.commit()
-
-            setting = ProjectSetting(
-                    project_id=project.id,
-                    name="svn_password",
-                    value="my_password",
-                    data_type="str",
-                    )
-            db.session.add(setting)
-            db.session.commit()
-
-            setting = ProjectSetting(
-                    project_id=project.id,
-                    name="svn_default_user",
-                    value="my_user",
-                    data_type="str",
-                    )
-            db.session.add(setting)
-            db.session.commit()
+        db.session.add(setting)
+        db.session.commit()
+
+        setting = ProjectSetting(
+                project_id=project.id,
+                name="svn_default_user",
+                value="my_user",
+                data_type="str",
+                )
+        db.session.add(setting)
+        db.session.commit()
+
+    # Run the app in production mode (no reloader, prevents tests to run twice).
+    # A thread starts faster than a process,
+    # and the server accepts connections as soon as it's created (no need to wait).
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    import threading
+
+    # Quiet the werkzeug logger
+    if not VERBOSE:
+        import werkzeug._internal
+        werkzeug._internal._log = lambda *a, **b: None
 
-        # Run the app in production mode (prevents tests to run twice)
-        app.run(port=PORT, debug=debug)
+    # keep server output out of the client's captured stderr.
+    server_stderr = sys.stderr
 
-    from multiprocessing import Process
-    p = Process(target=run_testing_server, args=())
-    p.start()
+    class ServerRequestHandler(WSGIRequestHandler):
+        def make_environ(self):
+            environ = super().make_environ()
+            # used by Flask to log errors (instead of 'sys.stderr' at the time of the request)
+            environ["wsgi.errors"] = server_stderr
+            return environ
 
-    os.system("sleep 1")
-    return p
+    server_log_handler = logging.StreamHandler(server_stderr)
+    for log_id in ("webservice", "werkzeug"):
+        logger = logging.getLogger(log_id)
+        logger.addHandler(server_log_handler)
+        # don't fall back to handlers bound to (or looking up) the captured stderr.
+        logger.propagate = False
+    del server_log_handler, log_id, logger
+
+    app.debug = debug
+    httpd = make_server("127.0.0.1", PORT, app, threaded=True, request_handler=ServerRequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    return httpd, thread
+
+
+def server_stop(data):
+    httpd, thread = data
+    httpd.shutdown()
+    thread.join()
+    httpd.server_close()
+
+
+# ------------------------------------------------------------------------------
+# Background Removal
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+# a single thread, so removing doesn't compete with the tests for I/O
+_rmtree_executor = ThreadPoolExecutor(max_workers=1)
+_rmtree_futures = []
+_rmtree_counter = itertools.count()
+
+
+def rmtree_background(path):
+    """
+    Move the directory aside and remove it in the background,
+    so the path can be used again immediately.
+    """
+    path_trash = "%s.trash.%d.%d" % (path, os.getpid(), next(_rmtree_counter))
+    try:
+        os.rename(path, path_trash)
+    except FileNotFoundError:
+        return
+    _rmtree_futures.append(_rmtree_executor.submit(shutil.rmtree, path_trash, ignore_errors=True))
+
+
+def rmtree_background_wait():
+    """
+    Wait for all directories passed to 'rmtree_background' to be removed.
+    """
+    for future in _rmtree_futures:
+        future.result()
+    _rmtree_futures.clear()
 
 
 def global_setup(use_server=True):
@@ -564,16 +744,14 @@ def global_setup(use_server=True):
 
     if VERBOSE:
         # for server
-        import logging
         logging.basicConfig(level=logging.DEBUG)
-        del logging
 
     shutil.rmtree(TEMP_SERVER, ignore_errors=True)
+    shutil.rmtree(TEMP_SNAPSHOT, ignore_errors=True)
     shutil.rmtree(TEMP_LOCAL, ignore_errors=True)
 
     if use_server:
-        p = server()
-        data.append(p)
+        data.append(server())
 
     return data
 
@@ -581,10 +759,11 @@ def global_setup(use_server=True):
 def global_teardown(data, use_server=True):
 
     if use_server:
-        p = data.pop(0)
-        p.terminate()
+        server_stop(data.pop(0))
 
+    rmtree_background_wait()
     shutil.rmtree(TEMP_SERVER, ignore_errors=True)
+    shutil.rmtree(TEMP_SNAPSHOT, ignore_errors=True)
     shutil.rmtree(TEMP_LOCAL, ignore_errors=True)
 
 
@@ -593,52 +772,60 @@ def global_teardown(data, use_server=True):
 
 import unittest
 
+# data from 'global_setup', shared by all tests in this module
+_global_data = []
+
+
+def setUpModule():
+    # the server is only started for tests which need it (see 'global_server_ensure').
+    _global_data[:] = global_setup(use_server=False)
+
+
+def global_server_ensure():
+    # start the server once (not for each test),
+    # the tests only share the project which is created on startup.
+    if not _global_data:
+        _global_data.append(server())
+
+
+def tearDownModule():
+    blender_worker_close()
+    global_teardown(_global_data, use_server=bool(_global_data))
+
 
 class BamSimpleTestCase(unittest.TestCase):
     """
     Basic testcase, only make temp dirs.
     """
     def setUp(self):
-
-        # for running single tests
-        if __name__ != "__main__":
-            self._data = global_setup(use_server=False)
-
-        if not os.path.isdir(TEMP_LOCAL):
-            os.makedirs(TEMP_LOCAL)
+        os.makedirs(TEMP_LOCAL, exist_ok=True)
 
     def tearDown(self):
         # input('Wait:')
-        shutil.rmtree(TEMP_LOCAL)
-
-        # for running single tests
-        if __name__ != "__main__":
-            global_teardown(self._data, use_server=False)
+        rmtree_background(TEMP_LOCAL)
 
 
 class BamSessionTestCase(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        global_server_ensure()
 
-        # for running single tests
-        if __name__ != "__main__":
-            self._data = global_setup()
-
-        if not os.path.isdir(TEMP_LOCAL):
-            os.makedirs(TEMP_LOCAL)
-        # Create local storage directory
-        if not os.path.isdir(self.path_local_store):
-            os.makedirs(self.path_local_store)
+    def setUp(self):
+        # Create local storage directory (and TEMP_LOCAL which contains it)
+        os.makedirs(self.path_local_store, exist_ok=True)
 
-        # Create remote storage (usually is on the server).
-        # SVN repo and SVN checkout will live here
-        if not os.path.isdir(self.path_remote_store):
-            os.makedirs(self.path_remote_store)
+        # The SVN repo and checkout are the same for every test,
+        # copy them from the snapshot (at the same location, so the checkout's URL stays valid).
+        if USE_SNAPSHOT and os.path.isdir(TEMP_SNAPSHOT):
+            shutil.copytree(TEMP_SNAPSHOT, self.path_remote_store, symlinks=True)
+            return
 
-        # Check for SVN repo directory
+        # Create remote storage (usually is on the server),
+        # along with the SVN repo directory, SVN repo and SVN checkout will live here
         path_svn_repo = os.path.join(self.path_remote_store, "svn_repo")
-        if not os.path.isdir(path_svn_repo):
-            os.makedirs(path_svn_repo)
+        os.makedirs(path_svn_repo, exist_ok=True)
 
         # Create a fresh SVN repository
         if not svn_repo_create(self.proj_name, path_svn_repo):
@@ -652,13 +839,12 @@ class BamSessionTestCase(unittest.TestCase):
         if not svn_repo_checkout(path_svn_repo_url, path_svn_checkout):
             self.fail("svn_repo: checkout %r" % path_svn_repo_url)
 
+        if USE_SNAPSHOT:
+            shutil.copytree(self.path_remote_store, TEMP_SNAPSHOT, symlinks=True)
+
     def tearDown(self):
         # input('Wait:')
-        shutil.rmtree(TEMP_LOCAL)
-
-        # for running single tests
-        if __name__ != "__main__":
-            global_teardown(self._data)
+        rmtree_background(TEMP_LOCAL)
 
     def get_url(self):
         url_full = "%s@%s/%s" % (self.user_name, self.server_addr, self.proj_name)
@@ -670,6 +856,8 @@ class BamSessionTestCase(unittest.TestCase):
         self.path_remote_store = os.path.join(TEMP_LOCAL, "remote_store")
 
         self.proj_name = PROJECT_NAME
+        # computed once, every test needs it
+        self.proj_path = os.path.join(self.path_local_store, self.proj_name)
         self.user_name = "user"
         self.server_addr = "http://localhost:%s" % PORT
 
@@ -677,8 +865,7 @@ class BamSessionTestCase(unittest.TestCase):
         url_full, user_name, url = self.get_url()
         stdout, stderr = bam_run(["init", url_full], self.path_local_store)
         self.assertEqual("", stderr)
-        proj_path = os.path.join(self.path_local_store, self.proj_name)
-        return proj_path
+        return self.proj_path
 
     def init_session(self, session_name):
         """
@@ -753,7 +940,7 @@ class BamCommitTest(BamSessionTestCase):
         proj_path, session_path = self.init_session(session_name)
 
         # check an empty commit fails gracefully
-        stdout, stderr = bam_run(["commit", "-m", "test message"], session_path)
+        stdout, stderr = bam_run(["commit", "-m", "test message"], session_path, capture=True)
         self.assertEqual("", stderr)
         self.assertEqual("Nothing to commit!\n", stdout)
 
@@ -942,7 +1129,7 @@ class BamCheckoutTest(BamSessionTestCase):
         if 1:
             # try to commit (ensure UUID's are correct)
             # (not mismatch since the variations are applied)
-            stdout, stderr = bam_run(["commit", "-m", "test message"], session_path)
+            stdout, stderr = bam_run(["commit", "-m", "test message"], session_path, capture=True)
             self.assertEqual("", stderr)
             self.assertEqual("Nothing to commit!\n", stdout)
 
@@ -1025,7 +1212,7 @@ class BamCheckoutTest(BamSessionTestCase):
         shutil.rmtree(session_path)
 
         session_path = session_path
-        stdout, stderr = bam_run(["checkout", blendfile, "--output", session_path], proj_path)
+        stdout, stderr = bam_run(["checkout", blendfile, "--output", session_path], proj_path, capture=True)
         self.assertEqual("", stderr)
         self.assertIn("source missing", stdout)
         self.assertIn(images[0], stdout)
@@ -1043,7 +1230,7 @@ class BamUpdateTest(BamSessionTestCase):
     def test_update_blank(self):
         session_name = "mysession"
         proj_path, session_path = self.init_session(session_name)
-        stdout, stderr = bam_run(["update"], session_path)
+        stdout, stderr = bam_run(["update"], session_path, capture=True)
         # Empty and new session should not update at all
         self.assertEqual("", stderr)
         self.assertEqual("Nothing to update!\n", stdout)
@@ -1102,7 +1289,7 @@ class BamRevertTest(BamSessionTestCase):
         stdout, stderr = bam_run(["commit", "-m", "commit test"], session_path)
         self.assertEqual("", stderr)
 
-        stdout, stderr = bam_run(["status", ], session_path)
+        stdout, stderr = bam_run(["status", ], session_path, capture=True)
         self.assertEqual("", stdout)
         self.assertEqual("", stderr)
 
@@ -1175,50 +1362,69 @@ class BamRevertTest(BamSessionTestCase):
 
 class BamBlendTest(BamSimpleTestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        import inspect
+        import blendfile_templates
+
+        # [(create_id, create_fn), ...]
+        cls.templates = [
+            (create_id, create_fn)
+            for create_id, create_fn in vars(blendfile_templates).items()
+            if create_id.startswith("create_") and inspect.isfunction(create_fn)
+            ]
+
     def test_create_all(self):
         """
         This simply tests all the create functions run without error.
         """
-        import blendfile_templates
         TEMP_SESSION = os.path.join(TEMP_LOCAL, "blend_file_template")
+        # avoid joining for every template
+        TEMP_SESSION_PREFIX = TEMP_SESSION + os.sep
 
         def iter_files_session():
-            for dirpath, dirnames, filenames in os.walk(TEMP_SESSION):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    yield filepath
-
-        for create_id, create_fn in blendfile_templates.__dict__.items():
-            if (create_id.startswith("create_") and create_fn.__class__.__name__ == "function"):
-
-                # ignore create functions which need data
-                if create_id in {"create_from_file_liblinks"}:
-                    continue
-
-                os.makedirs(TEMP_SESSION)
-
-                blendfile = os.path.join(TEMP_SESSION, create_id + ".blend")
-                deps = []
-
-                if not blendfile_template_create(blendfile, TEMP_SESSION, create_id, None, deps):
-                    # self.fail("blend file couldn't be create")
-                    # ... we want to keep running
-                    self.assertTrue(False, True)  # GRR, a better way?
-                    shutil.rmtree(TEMP_SESSION)
-                    continue
+            # 'scandir' entries know their type (no 'stat' for each file)
+            stack = [TEMP_SESSION]
+            while stack:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            yield entry.path
+
+        for create_id, create_fn in self.templates:
+            # ignore create functions which need data
+            if create_id in {"create_from_file_liblinks"}:
+                continue
+
+            os.makedirs(TEMP_SESSION)
+
+            blendfile = TEMP_SESSION_PREFIX + create_id + ".blend"
+            deps = []
+
+            if not blendfile_template_create(blendfile, TEMP_SESSION, create_id, None, deps):
+                # self.fail("blend file couldn't be create")
+                # ... we want to keep running
+                self.assertTrue(False, True)  # GRR, a better way?
+                shutil.rmtree(TEMP_SESSION)
+                continue
 
-                self.assertTrue(os.path.exists(blendfile))
-                with open(blendfile, 'rb') as blendfile_handle:
-                    self.assertEqual(b'BLENDER', blendfile_handle.read(7))
-                os.remove(blendfile)
+            self.assertTrue(os.path.exists(blendfile))
+            with open(blendfile, 'rb') as blendfile_handle:
+                self.assertEqual(b'BLENDER', blendfile_handle.read(7))
+            os.remove(blendfile)
 
-                # check all deps are accounted for
-                for f in deps:
-                    self.assertTrue(os.path.exists(f))
-                for f in iter_files_session():
-                    self.assertIn(f, deps)
+            # check all deps are accounted for
+            # report all missing files at once
+            deps_missing = [f for f in deps if not os.path.exists(f)]
+            self.assertFalse(deps_missing, msg=deps_missing)
+            deps_set = frozenset(deps)
+            for f in iter_files_session():
+                self.assertIn(f, deps_set)
+            del deps_set, deps_missing
 
-                shutil.rmtree(TEMP_SESSION)
+            shutil.rmtree(TEMP_SESSION)
 
     def test_empty(self):
         file_name = "testfile.blend"
@@ -1650,7 +1856,7 @@ class BamRelativeAbsoluteTest(BamSessionTestCase):
         self.assertEqual(ret[1][3], "OK")
 
         import re
-        stdout, stderr = bam_run(["status"], session_path)
+        stdout, stderr = bam_run(["status"], session_path, capture=True)
         pattern = re.compile("D:|M:")
         changes = pattern.search(stdout) != None
         self.assertEqual(False, changes)
@@ -1729,7 +1935,7 @@ class BamIgnoreTest(BamSessionTestCase):
         self.assertEqual("", stderr)
 
         # try to commit
-        stdout, stderr = bam_run(["commit", "-m", "test message"], session_path)
+        stdout, stderr = bam_run(["commit", "-m", "test message"], session_path, capture=True)
         self.assertEqual("", stderr)
         self.assertEqual("Nothing to commit!\n", stdout)
 
@@ -1756,6 +1962,100 @@ class BamIgnoreTest(BamSessionTestCase):
         self.assertRaises(RuntimeError, bam_run, ["status", ], session_path)
 
 
+class BamPackTest(BamSimpleTestCase):
+    """
+    Test packing blend files directly (without the 'bam' command).
+
+    note: this doesn't need any bam-session. simply a directory to work in.
+    """
+
+    @staticmethod
+    def blends_copy(name):
+        # work on a copy, the files may be modified by a failing test.
+        path = os.path.join(TEMP_LOCAL, "blends", name)
+        shutil.copytree(os.path.join(CURRENT_DIR, "blends", name), path)
+        return path
+
+    def test_pack_same_file(self):
+        """
+        Packing into the source directory must never truncate files used by the blend.
+        """
+        from bam.blend import blendfile_pack
+
+        lib_dir = os.path.join(self.blends_copy("multi_level_link"), "level1_lib")
+        texture = os.path.join(lib_dir, "level2_lib", "texture.png")
+        with open(texture, 'rb') as f:
+            texture_data = f.read()
+
+        with self.assertRaises(shutil.SameFileError):
+            for msg in blendfile_pack.pack(
+                    os.path.join(lib_dir, "level1_lib.blend").encode('utf-8'),
+                    os.path.join(lib_dir, "packed.blend").encode('utf-8'),
+                    mode='FILE',
+                    ):
+                pass
+
+        with open(texture, 'rb') as f:
+            self.assertEqual(texture_data, f.read())
+
+    @staticmethod
+    def files_read(path):
+        # {path: data}
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(path):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                with open(filepath, 'rb') as f:
+                    files[filepath] = f.read()
+        return files
+
+    def test_pack_readonly_originals(self):
+        """
+        Read-only packing (which may hard-link temp files to the originals)
+        must leave the originals untouched, even when packing over the source.
+        """
+        from bam.blend import blendfile_pack
+
+        path = self.blends_copy("variations")
+        files_orig = self.files_read(path)
+        blendfile = os.path.join(path, "cone.blend").encode('utf-8')
+
+        for msg in blendfile_pack.pack(blendfile, blendfile, mode='FILE', readonly=True):
+            pass
+
+        files = self.files_read(path)
+        for filepath, data in files_orig.items():
+            self.assertEqual(data, files[filepath], msg=filepath)
+
+    def test_pack_readonly_no_shared_files(self):
+        """
+        Packed files must not share their data (inode) with the source files.
+        """
+        from bam.blend import blendfile_pack
+
+        path = self.blends_copy("multi_level")
+        path_dst = os.path.join(TEMP_LOCAL, "packed")
+
+        for msg in blendfile_pack.pack(
+                os.path.join(path, "subdir", "house_lib_user.blend").encode('utf-8'),
+                os.path.join(path_dst, "house_lib_user.blend").encode('utf-8'),
+                mode='FILE',
+                readonly=True,
+                ):
+            pass
+
+        files_src_stat = {
+                (st.st_dev, st.st_ino)
+                for st in (os.stat(f) for f in self.files_read(path))
+                }
+        files_dst = self.files_read(path_dst)
+        # the blend file & its libraries
+        self.assertEqual(3, len(files_dst))
+        for filepath in files_dst:
+            st = os.stat(filepath)
+            self.assertNotIn((st.st_dev, st.st_ino), files_src_stat, msg=filepath)
+
+
 class BamRemapTest(BamSimpleTestCase):
     """
     Test remapping existing blend files via the 'bam remap' command.
@@ -1836,6 +2136,5 @@ class BamRemapTest(BamSimpleTestCase):
 
 
 if __name__ == '__main__':
-    data = global_setup()
+    # server setup is handled by 'BamSessionTestCase', teardown by 'tearDownModule'
     unittest.main(exit=False)
-    global_teardown(data)